@@ -1,19 +1,27 @@
 # pylint: skip-file
 # mypy: disable-error-code="import-not-found"
+import functools
 import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
 import sys
+import threading
+import time
+import weakref
 from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Tuple, TypeVar
 
-from pydantic import BaseModel, Field
-
 try:
     from settings import settings
+
+    _HAVE_SETTINGS = True
 except ImportError:
     print("Logger: Settings not imported")
-    pass
+    _HAVE_SETTINGS = False
 
 propertyReturn = TypeVar("propertyReturn")
 
@@ -24,17 +32,30 @@ def classproperty(meth: Callable[..., propertyReturn]) -> propertyReturn:
     return classmethod(property(meth))  # type: ignore
 
 
+@functools.lru_cache(maxsize=1)
+def _base_log_dir() -> Path:
+    # "logs" next to the script's folder; a script directly under "/" logs to "/logs".
+    parents = Path(sys.argv[0]).resolve().parents
+    return parents[min(1, len(parents) - 1)] / "logs"
+
+
+# Every UTC offset is a multiple of 15 minutes, so no bucket spans a local midnight.
+_SAVE_PATH_BUCKET_SECONDS = 15 * 60
+
+
+@functools.lru_cache(maxsize=1)
+def _save_path_for(time_bucket: int) -> Path:
+    day = datetime.fromtimestamp(time_bucket * _SAVE_PATH_BUCKET_SECONDS)
+    return _base_log_dir() / f"{day:%Y.%m.%d}.log"
+
+
 class DEFAULT_VALUES:
     log_level: str = "INFO"
     logger_name: str = "main_logger"
 
     @classproperty
     def save_path(_) -> Path:
-        return (
-            Path(sys.argv[0]).parents[1]
-            / "logs"
-            / (datetime.now().strftime("%Y.%m.%d") + ".log")
-        )
+        return _save_path_for(int(time.time() // _SAVE_PATH_BUCKET_SECONDS))
 
 
 LOG_LEVELS: dict[str, int] = {
@@ -45,39 +66,213 @@ LOG_LEVELS: dict[str, int] = {
     "DEBUG": logging.DEBUG,
 }
 
+_LEVELS: tuple[tuple[str, int], ...] = tuple(LOG_LEVELS.items())
+
+_STREAM_FMT = logging.Formatter("%(levelname)-8s %(message)s")
+_FILE_FMT = logging.Formatter("%(levelname)-8s %(asctime)-3s %(message)s")
+
+_FILE_BUFFER_SIZE = 64 * 1024
+
+
+def _noop(*_: Any, **__: Any) -> None:
+    return None
+
+
+def _in_worker_process(owner_pid: int) -> bool:
+    """Whether this process may end without running logging.shutdown().
+
+    Multiprocessing workers leave through os._exit (or are terminated), whatever the
+    start method, and a plain fork of the process that built a handler never runs it.
+    """
+    return os.getpid() != owner_pid or multiprocessing.parent_process() is not None
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """FileHandler with a large write buffer that is flushed for warnings and worse.
+
+    In a worker process every record is flushed, because workers exit without running
+    the shutdown hooks that would write out the buffer.
+    """
+
+    def __init__(self, filename: Path) -> None:
+        self._pid = os.getpid()
+        # Truncate once in the main process and append afterwards, so a worker that
+        # builds, opens or flushes a handler never truncates what the others wrote.
+        if not _in_worker_process(self._pid):
+            with open(filename, "w"):
+                pass
+        self._flush_now = True
+        super().__init__(filename, mode="a")
+        _BUFFERED_FILE_HANDLERS.add(self)
+
+    def _open(self) -> Any:
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=_FILE_BUFFER_SIZE,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # StreamHandler.emit flushes after every record; flush() decides if it does.
+        is_problem = record.levelno >= logging.WARNING
+        self._flush_now = is_problem or _in_worker_process(self._pid)
+        try:
+            super().emit(record)
+        finally:
+            self._flush_now = True
+
+    def flush(self) -> None:
+        if self._flush_now:
+            super().flush()
+
+
+_BUFFERED_FILE_HANDLERS: "weakref.WeakSet[_BufferedFileHandler]" = weakref.WeakSet()
+_HELD_OVER_FORK: list[_BufferedFileHandler] = []
+
+
+def _before_fork() -> None:
+    # Write out the buffers and hold the locks over the fork, so a child never inherits
+    # (and later writes a second time) records the parent still had buffered.
+    _HELD_OVER_FORK.extend(_BUFFERED_FILE_HANDLERS)
+    for handler in _HELD_OVER_FORK:
+        handler.acquire()
+        handler.flush()
+
+
+def _after_fork_in_parent() -> None:
+    for handler in _HELD_OVER_FORK:
+        handler.release()
+    _HELD_OVER_FORK.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    # The handler locks themselves are re-created in the child by the logging module.
+    os.register_at_fork(
+        before=_before_fork,
+        after_in_parent=_after_fork_in_parent,
+        after_in_child=_HELD_OVER_FORK.clear,
+    )
 
-class Logger(BaseModel):
-    logger: logging.Logger = Field(...)
-    log_level_is_on: dict[str, bool] = Field(...)
-    problem_occurred: bool = False
-    save_path: Path = Field(...)
 
-    class Config:
-        arbitrary_types_allowed = True
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that owns the QueueListener writing its records.
+
+    The calling thread only merges `msg % args` (and formats a traceback) in `prepare`;
+    the handlers' formatting and I/O run in the listener thread. In a worker process,
+    records still queued at exit would be lost, so there they go to the handlers
+    synchronously and no listener thread is started.
+    """
+
+    def __init__(self, *handlers: logging.Handler) -> None:
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        super().__init__(log_queue)
+        self.queue_listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        self._pid = os.getpid()
+        self._listening = False
+        self._is_open = True
+
+    @property
+    def alive(self) -> bool:
+        return self._is_open
+
+    def start(self) -> None:
+        if not _in_worker_process(self._pid):
+            self.queue_listener.start()
+            self._listening = True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if _in_worker_process(self._pid):
+            self.queue_listener.handle(record)
+        else:
+            super().emit(record)
+
+    def close(self) -> None:
+        # Called by replace_handlers() and again by logging.shutdown() at exit.
+        if self._listening and os.getpid() == self._pid:
+            # Writes out the records that are still queued.
+            self.queue_listener.stop()
+        self._listening = False
+        self._is_open = False
+        for handler in self.queue_listener.handlers:
+            handler.close()
+        super().close()
+
+
+class Logger:
+    """Thin wrapper around a `logging.Logger` that remembers whether a warning or worse was logged.
+
+    Pass the arguments %-style (`logger.info("value: %s", value)`) instead of a pre-formatted
+    f-string, so the message is only built when the level is actually enabled.
+    """
+
+    __slots__ = (
+        "logger",
+        "problem_occurred",
+        "save_path",
+        "critical",
+        "error",
+        "warning",
+        "info",
+        "debug",
+        "_cfg",
+    )
+
+    logger: logging.Logger
+    problem_occurred: bool
+    save_path: Path
+    critical: Callable[..., None]
+    error: Callable[..., None]
+    warning: Callable[..., None]
+    info: Callable[..., None]
+    debug: Callable[..., None]
+    _cfg: Tuple[str, Path, str]
 
     def __init__(self) -> None:
         log_level, save_path, logger_name = self._get_data_from_settings()
-        logger = self._get_logger(log_level, save_path, logger_name)
-        log_level_is_on: dict[str, bool] = {
-            key: logger.isEnabledFor(val) for (key, val) in LOG_LEVELS.items()
-        }
-        super().__init__(
-            logger=logger, log_level_is_on=log_level_is_on, save_path=save_path
+        self.logger = self._get_logger(log_level, save_path, logger_name)
+        self.problem_occurred = False
+        self.save_path = save_path
+        self._cfg = (log_level, save_path, logger_name)
+        self._bind_levels()
+
+    def _bind_levels(self) -> None:
+        """Bind the level methods once, so a disabled level is a plain no-op call."""
+        logger = self.logger
+        c_on, e_on, w_on, i_on, d_on = (
+            logger.isEnabledFor(level) for _, level in _LEVELS
         )
+        self.critical = self._flag_problem(logger.critical) if c_on else _noop
+        self.error = self._flag_problem(logger.error) if e_on else _noop
+        self.warning = self._flag_problem(logger.warning) if w_on else _noop
+        self.info = logger.info if i_on else _noop
+        self.debug = logger.debug if d_on else _noop
+
+    def _flag_problem(self, log: Callable[..., None]) -> Callable[..., None]:
+        def log_problem(*args: Any, **kwargs: Any) -> None:
+            self.problem_occurred = True
+            log(*args, **kwargs)
+
+        return log_problem
 
     @staticmethod
     def _get_data_from_settings() -> Tuple[str, Path, str]:
-        log_level = DEFAULT_VALUES.log_level
-        save_path = DEFAULT_VALUES.save_path
-        logger_name = DEFAULT_VALUES.logger_name
-
-        if "settings" in sys.modules:
-            if hasattr(settings, "log_level"):
-                log_level = settings.log_level
-            if hasattr(settings, "save_path"):
-                save_path = settings.save_path
-            if hasattr(settings, "logger_name"):
-                logger_name = settings.logger_name
+        if not _HAVE_SETTINGS:
+            return (
+                DEFAULT_VALUES.log_level,
+                DEFAULT_VALUES.save_path,
+                DEFAULT_VALUES.logger_name,
+            )
+
+        log_level = getattr(settings, "log_level", DEFAULT_VALUES.log_level)
+        save_path = getattr(settings, "save_path", None)
+        if save_path is None:
+            # Only built when needed; it reads the clock and may resolve sys.argv[0].
+            save_path = DEFAULT_VALUES.save_path
+        logger_name = getattr(settings, "logger_name", DEFAULT_VALUES.logger_name)
         return log_level, save_path, logger_name
 
     def _get_logger(
@@ -95,62 +290,72 @@ class Logger(BaseModel):
         logger = logging.getLogger(logger_name)
         logger.setLevel(LOG_LEVELS[log_level])
 
-        stream_handlers = [
-            handler
-            for handler in logger.handlers
-            if isinstance(handler, logging.StreamHandler)
-        ]
-        file_handlers = [
-            handler
-            for handler in logger.handlers
-            if isinstance(handler, logging.FileHandler)
-        ]
-        if len(stream_handlers) == 0:
-            stream_handler = logging.StreamHandler()
-            stream_handler.setFormatter(
-                logging.Formatter("%(levelname)-8s %(message)s")
+        # A FileHandler is also a StreamHandler, so it must not count as the console.
+        has_stream = has_file = False
+        for handler in logger.handlers:
+            inner_handlers = (
+                handler.queue_listener.handlers
+                if isinstance(handler, _QueueHandler)
+                else (handler,)
             )
-            logger.addHandler(stream_handler)
+            for inner in inner_handlers:
+                if isinstance(inner, logging.FileHandler):
+                    has_file = True
+                elif isinstance(inner, logging.StreamHandler):
+                    has_stream = True
+            if has_stream and has_file:
+                break
 
-        if len(file_handlers) == 0:
+        handlers: list[logging.Handler] = []
+        if not has_stream:
+            stream_handler = logging.StreamHandler()
+            stream_handler.setFormatter(_STREAM_FMT)
+            handlers.append(stream_handler)
+
+        if not has_file:
             save_path.parent.mkdir(parents=True, exist_ok=True)
-            file_handler = logging.FileHandler(save_path, mode="w")
-            file_handler.setFormatter(
-                logging.Formatter("%(levelname)-8s %(asctime)-3s %(message)s")
-            )
-            logger.addHandler(file_handler)
+            file_handler = _BufferedFileHandler(save_path)
+            file_handler.setFormatter(_FILE_FMT)
+            handlers.append(file_handler)
+
+        if handlers:
+            queue_handler = _QueueHandler(*handlers)
+            logger.addHandler(queue_handler)
+            queue_handler.start()
         return logger
 
     def replace_handlers(self) -> None:
         self.problem_occurred = False
-        log_level, self.save_path, logger_name = self._get_data_from_settings()
-        for hdlr in logging.getLogger(logger_name).handlers[:]:
-            self.logger.removeHandler(hdlr)
-
-        self._get_logger(log_level, self.save_path, logger_name)
-
-    def critical(self, *args: Any) -> None:
-        if self.log_level_is_on["CRITICAL"]:
-            self.problem_occurred = True
-            self.logger.critical(*args)
+        cfg = self._get_data_from_settings()
+        # Rebuild anyway when our handlers were closed or removed by other code.
+        if cfg == self._cfg and any(
+            isinstance(hdlr, _QueueHandler) and hdlr.alive
+            for hdlr in self.logger.handlers
+        ):
+            return
 
-    def error(self, *args: Any) -> None:
-        if self.log_level_is_on["ERROR"]:
-            self.problem_occurred = True
-            self.logger.error(*args)
+        log_level, self.save_path, logger_name = self._cfg = cfg
+        # Detach from the logger in use, which differs from the new one when
+        # logger_name changed. Close the old file before the new handler truncates
+        # it, so no buffered records are written into the new file afterwards.
+        for hdlr in self.logger.handlers[:]:
+            self.logger.removeHandler(hdlr)
+            hdlr.close()
 
-    def warning(self, *args: Any) -> None:
-        if self.log_level_is_on["WARNING"]:
-            self.problem_occurred = True
-            self.logger.warning(*args)
+        self.logger = self._get_logger(log_level, self.save_path, logger_name)
+        self._bind_levels()
 
-    def info(self, *args: Any) -> None:
-        if self.log_level_is_on["INFO"]:
-            self.logger.info(*args)
 
-    def debug(self, *args: Any) -> None:
-        if self.log_level_is_on["DEBUG"]:
-            self.logger.debug(*args)
+_LOGGER_LOCK = threading.Lock()
 
 
-logger = Logger()
+def __getattr__(name: str) -> Any:
+    # The module-level logger is only built on first access, so importing this module
+    # does not touch the file system or attach handlers.
+    if name == "logger":
+        with _LOGGER_LOCK:
+            # Another thread may have built it while this one was waiting.
+            if "logger" not in globals():
+                globals()["logger"] = Logger()
+        return globals()["logger"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
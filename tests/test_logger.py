@@ -0,0 +1,228 @@
+import multiprocessing
+import subprocess
+import sys
+import textwrap
+import types
+from pathlib import Path
+
+import pytest
+
+from miscellaneous import logger as logger_module
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _configure(monkeypatch, **values):
+    monkeypatch.setattr(logger_module, "_HAVE_SETTINGS", True)
+    monkeypatch.setattr(
+        logger_module, "settings", types.SimpleNamespace(**values), raising=False
+    )
+
+
+def _close(log):
+    """Detach and close the handlers, writing out everything queued or buffered."""
+    for handler in log.logger.handlers[:]:
+        log.logger.removeHandler(handler)
+        handler.close()
+
+
+@pytest.fixture
+def log(monkeypatch, tmp_path, request):
+    _configure(
+        monkeypatch,
+        log_level="INFO",
+        save_path=tmp_path / "test.log",
+        logger_name=f"test.{request.node.name}",
+    )
+    log = logger_module.Logger()
+    yield log
+    _close(log)
+
+
+def test_settings_save_path_skips_default(monkeypatch, tmp_path):
+    def fail(_):
+        raise AssertionError("default save path was computed")
+
+    monkeypatch.setattr(logger_module, "_save_path_for", fail)
+    _configure(monkeypatch, save_path=tmp_path / "custom.log")
+
+    _, save_path, _ = logger_module.Logger._get_data_from_settings()
+    assert save_path == tmp_path / "custom.log"
+
+
+@pytest.mark.parametrize("level", ["warning", "error", "critical"])
+def test_problem_levels_set_problem_occurred(log, level):
+    getattr(log, level)("something went wrong")
+    assert log.problem_occurred
+
+
+def test_info_does_not_set_problem_occurred(log):
+    log.info("all good")
+    log.debug("all good")
+    assert not log.problem_occurred
+
+
+def test_records_reach_file_after_replace_handlers(log, monkeypatch, tmp_path):
+    new_path = tmp_path / "new.log"
+    _configure(
+        monkeypatch, log_level="INFO", save_path=new_path, logger_name=log.logger.name
+    )
+    log.replace_handlers()
+    log.info("after %s", "replace")
+    _close(log)
+
+    assert "after replace" in new_path.read_text()
+
+
+def test_replace_handlers_follows_logger_name(log, monkeypatch, tmp_path):
+    old_logger = log.logger
+    new_path = tmp_path / "renamed.log"
+    _configure(
+        monkeypatch,
+        log_level="INFO",
+        save_path=new_path,
+        logger_name=f"{old_logger.name}.renamed",
+    )
+    log.replace_handlers()
+    log.info("renamed")
+    _close(log)
+
+    assert log.logger is not old_logger
+    assert old_logger.handlers == []
+    assert "renamed" in new_path.read_text()
+
+
+def test_replace_handlers_reattaches_removed_handlers(log):
+    for handler in log.logger.handlers[:]:
+        log.logger.removeHandler(handler)
+        handler.close()
+
+    log.replace_handlers()
+    log.warning("back again")
+    _close(log)
+
+    assert "back again" in log.save_path.read_text()
+
+
+def _run_script(tmp_path, body):
+    """Run `body` as bin/script.py, so the default log directory is tmp_path/logs."""
+    script = tmp_path / "bin" / "script.py"
+    script.parent.mkdir()
+    script.write_text(
+        f"import sys\nsys.path.insert(0, {str(ROOT)!r})\n" + textwrap.dedent(body)
+    )
+    return subprocess.run(
+        [sys.executable, str(script)], capture_output=True, text=True, check=False
+    )
+
+
+def _log_file_text(tmp_path):
+    (log_file,) = (tmp_path / "logs").iterdir()
+    return log_file.read_text()
+
+
+def test_import_does_not_touch_file_system_or_handlers(tmp_path):
+    result = _run_script(
+        tmp_path,
+        """
+        import logging
+
+        import miscellaneous.logger
+
+        assert logging.getLogger("main_logger").handlers == []
+        """,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert not (tmp_path / "logs").exists()
+
+
+def test_no_error_at_exit_after_reconfiguration(tmp_path):
+    result = _run_script(
+        tmp_path,
+        """
+        import types
+
+        from miscellaneous import logger as logger_module
+        from miscellaneous.logger import logger
+
+        logger.info("first")
+        logger_module._HAVE_SETTINGS = True
+        logger_module.settings = types.SimpleNamespace(log_level="DEBUG")
+        logger.replace_handlers()
+        logger.debug("second")
+        """,
+    )
+
+    assert result.returncode == 0
+    assert "Traceback" not in result.stderr
+    assert "DEBUG    second" in result.stderr
+    assert "second" in _log_file_text(tmp_path)
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="needs the fork start method",
+)
+def test_forked_workers_reach_console_and_file(tmp_path):
+    result = _run_script(
+        tmp_path,
+        """
+        import multiprocessing
+
+        from miscellaneous.logger import logger
+
+
+        def work(i):
+            logger.info("worker %s info", i)
+            logger.warning("worker %s warning", i)
+            logger.error("worker %s failed", i)
+            return logger.problem_occurred
+
+
+        if __name__ == "__main__":
+            logger.info("parent start")
+            with multiprocessing.get_context("fork").Pool(2) as pool:
+                assert all(pool.map(work, range(4)))
+            logger.info("parent end")
+        """,
+    )
+
+    assert result.returncode == 0, result.stderr
+    text = _log_file_text(tmp_path)
+    for i in range(4):
+        for message in (
+            f"worker {i} info",
+            f"worker {i} warning",
+            f"worker {i} failed",
+        ):
+            assert text.count(message) == 1
+            assert message in result.stderr
+    assert "parent start" in text and "parent end" in text
+
+
+@pytest.mark.parametrize("method", multiprocessing.get_all_start_methods())
+def test_workers_that_build_the_logger_reach_console_and_file(tmp_path, method):
+    result = _run_script(
+        tmp_path,
+        f"""
+        import multiprocessing
+
+        import miscellaneous.logger as logger_module
+
+
+        def work(i):
+            logger_module.logger.info("worker %s info", i)
+
+
+        if __name__ == "__main__":
+            with multiprocessing.get_context({method!r}).Pool(2) as pool:
+                pool.map(work, range(4))
+        """,
+    )
+
+    assert result.returncode == 0, result.stderr
+    text = _log_file_text(tmp_path)
+    for i in range(4):
+        assert text.count(f"worker {i} info") == 1
+        assert f"worker {i} info" in result.stderr